@@ -1,12 +1,22 @@
-import uuid
-from datetime import datetime, timezone
-
-from fastapi import APIRouter, Request, Response
+import asyncio
+import secrets
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Request
+from fastapi.responses import ORJSONResponse
+from loguru import logger
 from pydantic import Field
 
 from core.sockets.types.envelope import AliasedBaseModel
 
-router = APIRouter(prefix="/session")
+router = APIRouter(prefix="/session", default_response_class=ORJSONResponse)
+
+logger = logger.bind(name=__name__)
+
+SESSION_TTL_SECONDS = 3600  # 1 hour, matches the cookie max_age
+SESSION_SWEEP_INTERVAL_SECONDS = 60
+MAX_SESSIONS = 10_000
 
 
 class Session(AliasedBaseModel):
@@ -15,7 +25,35 @@ class Session(AliasedBaseModel):
     sids: set[str] = Field(default_factory=set)
 
 
-sessions: dict[str, Session] = {}
+# insertion order == creation order, so the oldest session is always first
+sessions: OrderedDict[str, Session] = OrderedDict()
+
+
+def add_session(session: Session) -> None:
+    sessions[session.session_id] = session
+    while len(sessions) > MAX_SESSIONS:
+        sessions.popitem(last=False)
+
+
+def evict_expired_sessions() -> int:
+    """Drop sessions past the TTL, oldest first, and return how many were dropped."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=SESSION_TTL_SECONDS)
+    evicted = 0
+    while sessions and next(iter(sessions.values())).created_at <= cutoff:
+        sessions.popitem(last=False)
+        evicted += 1
+    return evicted
+
+
+async def sweep_expired_sessions(
+    interval: float = SESSION_SWEEP_INTERVAL_SECONDS,
+) -> None:
+    """Periodically evict expired sessions for clients that never call /destroy."""
+    while True:
+        await asyncio.sleep(interval)
+        evicted = evict_expired_sessions()
+        if evicted:
+            logger.info("Evicted {} expired sessions", evicted)
 
 
 class CreateSessionResponse(AliasedBaseModel):
@@ -23,19 +61,25 @@ class CreateSessionResponse(AliasedBaseModel):
     session_id: str
 
 
-@router.post("/create")
-async def create_session(response: Response) -> CreateSessionResponse:
-    session_id = str(uuid.uuid4())
+@router.post("/create", response_model=CreateSessionResponse)
+async def create_session() -> ORJSONResponse:
+    session_id = secrets.token_hex(16)
+    add_session(Session(session_id=session_id))
+    response = ORJSONResponse(
+        CreateSessionResponse(
+            message="session created", session_id=session_id
+        ).model_dump(by_alias=True)
+    )
     response.set_cookie(
         key="session_id",
         value=session_id,
         httponly=True,  # prevent javascript access
         secure=True,  # only send cookie over HTTPS
         samesite="lax",
-        max_age=3600,  # 1 hour
+        max_age=SESSION_TTL_SECONDS,
         path="/",
     )
-    return CreateSessionResponse(message="session created", session_id=session_id)
+    return response
 
 
 class ValidateSessionResponse(AliasedBaseModel):
@@ -43,19 +87,28 @@ class ValidateSessionResponse(AliasedBaseModel):
     message: str
 
 
-@router.get("/validate")
-async def validate_session(request: Request) -> ValidateSessionResponse:
+# validation only ever answers with one of these, so dump them once
+_NO_SESSION_COOKIE = ValidateSessionResponse(
+    valid=False, message="No session found in cookies"
+).model_dump(by_alias=True)
+_UNKNOWN_SESSION = ValidateSessionResponse(
+    valid=False,
+    message="session found in cookies, but no active session with this id found.",
+).model_dump(by_alias=True)
+_SESSION_VALID = ValidateSessionResponse(
+    valid=True, message="session validated"
+).model_dump(by_alias=True)
+
+
+@router.get("/validate", response_model=ValidateSessionResponse)
+async def validate_session(request: Request) -> ORJSONResponse:
     session_id = request.cookies.get("session_id")
     if session_id is None:
-        return ValidateSessionResponse(
-            valid=False, message="No session found in cookies"
-        )
+        return ORJSONResponse(_NO_SESSION_COOKIE)
+    evict_expired_sessions()
     if session_id not in sessions:
-        return ValidateSessionResponse(
-            valid=False,
-            message="session found in cookies, but no active session with this id found.",
-        )
-    return ValidateSessionResponse(valid=True, message="session validated")
+        return ORJSONResponse(_UNKNOWN_SESSION)
+    return ORJSONResponse(_SESSION_VALID)
 
 
 class DestroySessionResponse(AliasedBaseModel):
@@ -63,16 +116,18 @@ class DestroySessionResponse(AliasedBaseModel):
     session_id: str
 
 
-@router.post("/destroy")
-async def destroy_session(request: Request) -> dict[str, str]:
+@router.post("/destroy", response_model=dict[str, str])
+async def destroy_session(request: Request) -> ORJSONResponse:
     session_id = request.cookies.get("session_id")
     if session_id is None:
-        return {"message": "No session found in cookies"}
+        return ORJSONResponse({"message": "No session found in cookies"})
     if session_id not in sessions:
-        return {
-            "message": "session found in cookies, but no active session with this id found."
-        }
+        return ORJSONResponse(
+            {
+                "message": "session found in cookies, but no active session with this id found."
+            }
+        )
     session = sessions[session_id]
     session.sids.clear()
     del sessions[session_id]
-    return {"message": "session destroyed", "session_id": session_id}
+    return ORJSONResponse({"message": "session destroyed", "session_id": session_id})
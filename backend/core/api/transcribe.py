@@ -1,41 +1,44 @@
-import uuid
+import secrets
 
 from fastapi import APIRouter, File, UploadFile
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from core.sockets import async_openai_client
 
-router = APIRouter(prefix="/transcribe", tags=["transcribe"])
+router = APIRouter(
+    prefix="/transcribe", tags=["transcribe"], default_response_class=ORJSONResponse
+)
 
 logger = logger.bind(name=__name__)
 
 
-@router.post("/whisper")
-async def transcribe_whisper(file: UploadFile = File(...)) -> str:
-    audio_bytes = await file.read()
-
+@router.post("/whisper", response_model=str)
+async def transcribe_whisper(file: UploadFile = File(...)) -> ORJSONResponse:
     content_type = file.content_type or "audio/webm"
     if not content_type.startswith("audio/"):
         raise ValueError(f"Invalid file content type: {content_type}")
 
     # Extract extension from content type
     extension = content_type.split("/")[-1]
-    unique_file_name = f"{uuid.uuid4()}.{extension}"
+    unique_file_name = f"{secrets.token_hex(16)}.{extension}"
 
     logger.info(
         "Transcribing audio file",
         file=unique_file_name,
-        file_size=len(audio_bytes),
+        file_size=file.size,
         file_type=file.content_type,
     )
-    file_tuple = (unique_file_name, audio_bytes, file.content_type)
+    # hand the spooled upload to the SDK as-is so the audio is streamed out
+    # rather than copied into a bytes object first
+    file_tuple = (unique_file_name, file.file, file.content_type)
     transcript = await async_openai_client.audio.transcriptions.create(
         model="whisper-1",
         file=file_tuple,
     )
-    return transcript.text
+    return ORJSONResponse(transcript.text)
 
 
-@router.post("/whisper-test")
-async def transcribe_whisper_test(file: UploadFile = File(...)) -> str:
-    return "transcription requested and mock done with audio file"
+@router.post("/whisper-test", response_model=str)
+async def transcribe_whisper_test(file: UploadFile = File(...)) -> ORJSONResponse:
+    return ORJSONResponse("transcription requested and mock done with audio file")
@@ -1,11 +1,52 @@
-import json
 import os
 import sys
 from pathlib import Path
 from typing import Optional
 
+import orjson
 from loguru import logger
 
+# loguru level name -> Cloud Logging severity
+_SEVERITY_MAPPING = {
+    "TRACE": "DEBUG",
+    "DEBUG": "DEBUG",
+    "INFO": "INFO",
+    "SUCCESS": "INFO",
+    "WARNING": "WARNING",
+    "ERROR": "ERROR",
+    "CRITICAL": "CRITICAL",
+}
+
+
+def _cloud_run_json_formatter(record):
+    """Format log record as JSON for Cloud Run."""
+    log_entry = {
+        "severity": _SEVERITY_MAPPING.get(record["level"].name, "INFO"),
+        "message": record["message"],
+        "timestamp": record["time"].isoformat(),
+        "logger": record["name"],
+        "module": record["module"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+
+    if record.get("extra"):
+        log_entry["extra"] = record["extra"]
+
+    if record.get("exception"):
+        log_entry["exception"] = {
+            "type": record["exception"].type.__name__,
+            "value": str(record["exception"].value),
+            "traceback": record["exception"].traceback,
+        }
+
+    # loguru treats the returned string as a format template, so the JSON has
+    # to be stashed on the record and referenced rather than returned inline
+    record["extra"]["serialized"] = orjson.dumps(
+        log_entry, default=str, option=orjson.OPT_NON_STR_KEYS
+    ).decode()
+    return "{extra[serialized]}\n"
+
 
 def setup_logging(
     level: str = "INFO", json_format: bool = True, log_file: Optional[str] = None
@@ -19,43 +60,9 @@ def setup_logging(
 
     if is_cloud_run:
         # Cloud Run: Use structured JSON logging to stdout
-        def json_formatter(record):
-            """Format log record as JSON for Cloud Run."""
-            severity_mapping = {
-                "TRACE": "DEBUG",
-                "DEBUG": "DEBUG",
-                "INFO": "INFO",
-                "SUCCESS": "INFO",
-                "WARNING": "WARNING",
-                "ERROR": "ERROR",
-                "CRITICAL": "CRITICAL",
-            }
-
-            log_entry = {
-                "severity": severity_mapping.get(record["level"].name, "INFO"),
-                "message": record["message"],
-                "timestamp": record["time"].isoformat(),
-                "logger": record["name"],
-                "module": record["module"],
-                "function": record["function"],
-                "line": record["line"],
-            }
-
-            if record.get("extra"):
-                log_entry["extra"] = record["extra"]
-
-            if record.get("exception"):
-                log_entry["exception"] = {
-                    "type": record["exception"].type.__name__,
-                    "value": str(record["exception"].value),
-                    "traceback": record["exception"].traceback,
-                }
-
-            return json.dumps(log_entry) + "\n"
-
         logger.add(
             sys.stdout,
-            format=json_formatter,
+            format=_cloud_run_json_formatter,
             level=level.upper(),
             backtrace=True,
             diagnose=True,
@@ -1,3 +1,6 @@
+import time
+from dataclasses import dataclass, field
+
 import instructor
 import socketio  # type: ignore[import-untyped]
 from loguru import logger
@@ -17,7 +20,15 @@ sio = socketio.AsyncServer(
     # logger=True,
     # engineio_logger=True,
 )
-active_connections: dict[str, dict] = {}
+
+
+@dataclass(slots=True)
+class ConnectionState:
+    sid: str
+    connected_at: float = field(default_factory=time.time)
+
+
+active_connections: dict[str, ConnectionState] = {}
 
 
 def register_sio_handlers() -> None:
@@ -31,10 +31,13 @@ class AssistantActor(BaseActor[AssistantRequest]):
         return validated_request.history
 
 
+# the actor holds no per-request state, so one instance serves every event
+assistant_actor = AssistantActor()
+
+
 @sio.on("c2s.assistant.stream.start")
 async def handle_chat_stream_start(
     sid: str,
     envelope: dict,
 ) -> str:
-    assistant_actor = AssistantActor()
     return assistant_actor.handle_stream_start(sid, envelope, AssistantRequest)
@@ -1,18 +1,31 @@
-import asyncio
-import uuid
+import secrets
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Generic, Literal, Protocol, Type, TypeVar
 
 from pydantic import BaseModel, ValidationError
 
-from core.sockets.types.envelope import AckFail, AckOk, Actor, Envelope, Error
+from core.sockets.types.envelope import (
+    ACK_INVALID_FORMAT,
+    ACK_MISSING_REQUEST_ID,
+    Actor,
+    Envelope,
+    ack_ok_json,
+)
 from core.sockets.types.message import Message
+from core.sockets.utils.tasks import spawn_stream_task
 
 MODEL_TYPE = Literal["gpt-4o", "gpt-5"]
 
 T = TypeVar("T", bound=BaseModel)
 
 
+@lru_cache(maxsize=32)
+def _envelope_type(data_type: Type[BaseModel]) -> Type[Envelope]:
+    """Parametrize Envelope once per payload type instead of on every event."""
+    return Envelope[data_type]  # type: ignore[valid-type]
+
+
 class StreamChunks(Protocol):
     async def __call__(
         self,
@@ -38,31 +51,19 @@ class BaseActor(ABC, Generic[T]):
 
     def handle_stream_start(self, sid: str, envelope: dict, data_type: Type[T]) -> str:
         try:
-            validated_envelope = Envelope[data_type].model_validate(envelope)  # type: ignore
+            validated_envelope = _envelope_type(data_type).model_validate(envelope)
 
             if validated_envelope.request_id is None:
-                return AckFail(
-                    ok=False,
-                    error=Error(
-                        code="invalid_envelope",
-                        message="The envelope is missing request_id",
-                    ),
-                ).model_dump_json()
+                return ACK_MISSING_REQUEST_ID
 
         except ValidationError:
-            return AckFail(
-                ok=False,
-                error=Error(
-                    code="invalid_envelope",
-                    message="The envelope is not in the correct format",
-                ),
-            ).model_dump_json()
+            return ACK_INVALID_FORMAT
 
-        stream_id = str(uuid.uuid4())
+        stream_id = secrets.token_hex(16)
 
         prepared_messages = self.prepare_messages(validated_envelope.data)
 
-        asyncio.create_task(
+        spawn_stream_task(
             self.stream_chunks(
                 sid,
                 prepared_messages,
@@ -73,8 +74,4 @@ class BaseActor(ABC, Generic[T]):
             )
         )
 
-        return AckOk(
-            ok=True,
-            request_id=validated_envelope.request_id,
-            stream_id=stream_id,
-        ).model_dump_json()
+        return ack_ok_json(validated_envelope.request_id, stream_id)
@@ -1,23 +1,38 @@
 import asyncio
-import json
 import os
+import secrets
+import shutil
 import tempfile
-import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
+import orjson
 from claude_code_sdk import (
+    AssistantMessage,
     ClaudeCodeOptions,
     ClaudeSDKClient,
     ContentBlock,
+    ResultMessage,
     TextBlock,
     ToolUseBlock,
+    UserMessage,
 )
 from claude_code_sdk import Message as ClaudeSDKMessage
 from loguru import logger
 from pydantic import Field, ValidationError
 
-from core.sockets.types.envelope import AckFail, AckOk, AliasedBaseModel, Envelope, Error
+from core.sockets.types.envelope import (
+    ACK_INVALID_FORMAT,
+    ACK_MISSING_REQUEST_ID,
+    AliasedBaseModel,
+    Envelope,
+    ack_ok_json,
+    chunk_frame_prefix,
+    stream_end_json,
+)
+from core.sockets.utils.streamer import EMIT_QUEUE_SIZE, emit_queued_deltas
+from core.sockets.utils.tasks import spawn_stream_task
 
 from .. import sio
 
@@ -28,8 +43,30 @@ class ClaudeSDKRequest(AliasedBaseModel):
     query: str = Field(description="The query for Claude SDK")
 
 
+# parametrize once; subscripting the generic per message repeats the lookup
+ClaudeSDKEnvelope = Envelope[ClaudeSDKRequest]
+
+
 DATA_DIR = Path("data")
 
+# the SDK message types that carry content blocks; system and result
+# messages have none
+CONTENT_MESSAGE_TYPES = (AssistantMessage, UserMessage)
+
+CHUNK_EVENT = "s2c.claude.stream.chunk"
+END_EVENT = "s2c.claude.stream.end"
+
+# ClaudeCodeOptions fields shared by every stream; only model and cwd vary.
+# The SDK only reads these, so one copy is shared across clients.
+CLAUDE_OPTIONS_KWARGS: dict[str, Any] = {
+    "allowed_tools": ["Read", "Write", "Bash", "Grep"],
+    "disallowed_tools": ["WebSearch", "Bash(rm -r*)"],
+    "permission_mode": "acceptEdits",
+    "extra_args": {
+        "verbose": "true",
+    },
+}
+
 
 class ClaudeSDKActor:
     def __init__(
@@ -42,48 +79,41 @@ class ClaudeSDKActor:
             os.getenv("OPERATION_TIMEOUT", "3600")
         )  # 1 hour default
         self.test = test
+        # admission control: streams past the limit wait for a slot
+        self.max_concurrent_streams = int(os.getenv("CLAUDE_MAX_CONCURRENT", "8"))
+        self._active_streams = 0
+        self._stream_slots = asyncio.Condition()
+        # content block type -> delta text, looked up by exact type
+        self._block_renderers: dict[type, Callable[[Any], str]] = {
+            TextBlock: lambda block: block.text,
+            ToolUseBlock: lambda block: self._format_tool_input(block.input),
+        }
 
     def handle_stream_start(self, sid: str, envelope: dict) -> str:
         try:
-            validated_envelope = Envelope[ClaudeSDKRequest].model_validate(envelope)  # type: ignore
+            validated_envelope = ClaudeSDKEnvelope.model_validate(envelope)
 
             if validated_envelope.request_id is None:
-                return self._ack_fail("The envelope is missing request_id")
+                return ACK_MISSING_REQUEST_ID
 
         except ValidationError:
-            return self._ack_fail("The envelope is not in the correct format")
+            return ACK_INVALID_FORMAT
 
-        stream_id = str(uuid.uuid4())
+        stream_id = secrets.token_hex(16)
 
         if not validated_envelope.data.query:
             raise ValueError("Query is required")
 
-        cwd = Path(tempfile.mkdtemp(dir="tmp"))
-        asyncio.create_task(
+        spawn_stream_task(
             self.stream_claude_code_sdk_chunks(
                 sid=sid,
                 user_query=validated_envelope.data.query,
                 request_id=validated_envelope.request_id,
                 stream_id=stream_id,
-                cwd=cwd,
             )
         )
 
-        return AckOk(
-            ok=True,
-            request_id=validated_envelope.request_id,
-            stream_id=stream_id,
-        ).model_dump_json()
-
-    def _ack_fail(self, message: str) -> str:
-        """Create a standardized invalid envelope error response."""
-        return AckFail(
-            ok=False,
-            error=Error(
-                code="invalid_envelope",
-                message=message,
-            ),
-        ).model_dump_json()
+        return ack_ok_json(validated_envelope.request_id, stream_id)
 
     async def stream_claude_code_sdk_chunks(
         self,
@@ -91,158 +121,139 @@ class ClaudeSDKActor:
         user_query: str,
         request_id: str,
         stream_id: str,
-        cwd: Path,
+        cwd: Path | None = None,
         model: str = "claude-3-5-sonnet-20241022",
     ) -> None:
         """Stream Claude SDK chunks to the client."""
-        cwd = cwd or Path.cwd()
+        async with self._stream_slot():
+            scratch_dir = cwd is None
+            if cwd is None:
+                # mkdtemp blocks on the filesystem; keep it off the loop and the ack
+                cwd = Path(await asyncio.to_thread(tempfile.mkdtemp, dir="tmp"))
 
-        async with self._create_claude_client(cwd, model) as client:
-            await client.query(user_query)
-            stream = client.receive_response()
-            await self._process_stream(stream, request_id, stream_id, sid)
+            try:
+                async with self._create_claude_client(cwd, model) as client:
+                    await client.query(user_query)
+                    stream = client.receive_response()
+                    await self._process_stream(stream, request_id, stream_id, sid)
+            finally:
+                # nothing reads a stream's scratch dir once the session is over
+                if scratch_dir:
+                    await asyncio.to_thread(shutil.rmtree, cwd, ignore_errors=True)
+
+    @asynccontextmanager
+    async def _stream_slot(self) -> AsyncIterator[None]:
+        """Hold one of the max_concurrent_streams SDK sessions for the block.
+
+        Each session owns a CLI subprocess and a temp dir, so bursts queue here
+        instead of spawning without bound.
+        """
+        async with self._stream_slots:
+            await self._stream_slots.wait_for(
+                lambda: self._active_streams < self.max_concurrent_streams
+            )
+            self._active_streams += 1
+        try:
+            yield
+        finally:
+            async with self._stream_slots:
+                self._active_streams -= 1
+                self._stream_slots.notify()
 
     def _create_claude_client(self, cwd: Path, model: str) -> ClaudeSDKClient:
         """Create and configure a Claude SDK client."""
         return ClaudeSDKClient(
-            ClaudeCodeOptions(
-                model=model,
-                cwd=cwd,
-                allowed_tools=["Read", "Write", "Bash", "Grep"],
-                disallowed_tools=["WebSearch", "Bash(rm -r*)"],
-                permission_mode="acceptEdits",
-                extra_args={
-                    "verbose": "true",
-                },
-            )
+            ClaudeCodeOptions(model=model, cwd=cwd, **CLAUDE_OPTIONS_KWARGS)
         )
 
     async def _process_stream(
         self, stream, request_id: str, stream_id: str, sid: str
     ) -> None:
-        """Process the stream of chunks from Claude SDK."""
-        seq = 0
-        async for chunk in stream:
-            logger.info(f"Chunk: {chunk}")
-            try:
-                await self.chunk_processor(chunk, request_id, stream_id, sid, seq)
-            except Exception as e:
-                logger.error(f"Error in chunk processor: {e}")
-
-    async def chunk_processor(
-        self,
-        chunk: ClaudeSDKMessage,
-        request_id: str,
-        stream_id: str,
-        sid: str,
-        seq: int,
-    ) -> None:
-        """Process individual chunks from Claude SDK."""
-        if not hasattr(chunk, "content"):
-            return
-
-        for block in chunk.content:
-            seq += 1
-            await self._process_content_block(block, request_id, stream_id, sid, seq)
-
-        if self._is_result_message(chunk):
+        """Process the stream of chunks from Claude SDK.
+
+        Deltas go through a bounded queue to an emitter task, so a slow client
+        backpressures the SDK receive loop only once the queue is full.
+        """
+        queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=EMIT_QUEUE_SIZE)
+        emitter = asyncio.create_task(
+            emit_queued_deltas(
+                queue,
+                sid,
+                CHUNK_EVENT,
+                chunk_frame_prefix(request_id, stream_id, "claude"),
+            )
+        )
+        finished = False
+        try:
+            async for chunk in stream:
+                logger.trace("Chunk: {}", chunk)
+                try:
+                    await self.chunk_processor(chunk, queue)
+                except Exception as e:
+                    logger.error(f"Error in chunk processor: {e}")
+                finished = finished or self._is_result_message(chunk)
+        finally:
+            await queue.put(None)
+            seq = await emitter
+
+        if finished:
             await self._send_stream_end(request_id, stream_id, sid, seq)
 
-    async def _process_content_block(
-        self,
-        block: ContentBlock | str | Any,
-        request_id: str,
-        stream_id: str,
-        sid: str,
-        seq: int,
+    async def chunk_processor(
+        self, chunk: ClaudeSDKMessage, queue: asyncio.Queue[str | None]
     ) -> None:
-        """Process individual content blocks within a chunk."""
-        if isinstance(block, TextBlock):
-            await self._send_text_chunk(block.text, request_id, stream_id, sid, seq)
-        elif isinstance(block, ToolUseBlock):
-            await self._send_tool_use_chunk(
-                block.input, request_id, stream_id, sid, seq
-            )
-        else:
-            logger.info(f"Unhandled block type: {type(block)}")
+        """Process individual chunks from Claude SDK.
 
-    async def _send_text_chunk(
-        self, text: str, request_id: str, stream_id: str, sid: str, seq: int
-    ) -> None:
-        """Send a text chunk to the client."""
-        envelope = self._create_chunk_envelope(
-            request_id, stream_id, seq, sid, {"delta": text}
-        )
-        await sio.emit("s2c.claude.stream.chunk", envelope, to=sid)
+        All content blocks of a message are joined into a single delta so the
+        message goes out in one emit instead of one per block.
+        """
+        if not isinstance(chunk, CONTENT_MESSAGE_TYPES):
+            return
 
-    async def _send_tool_use_chunk(
-        self, tool_input: dict, request_id: str, stream_id: str, sid: str, seq: int
-    ) -> None:
-        """Send a tool use chunk to the client."""
-        formatted_input = self._format_tool_input(tool_input)
-        envelope = self._create_chunk_envelope(
-            request_id, stream_id, seq, sid, {"delta": formatted_input}
-        )
-        await sio.emit("s2c.claude.stream.chunk", envelope, to=sid)
+        deltas = [
+            delta
+            for block in chunk.content
+            if (delta := self._process_content_block(block)) is not None
+        ]
+        if deltas:
+            await queue.put("".join(deltas))
+
+    def _process_content_block(self, block: ContentBlock | str | Any) -> str | None:
+        """Render a content block as the delta text sent to the client."""
+        render = self._block_renderers.get(type(block))
+        if render is None:
+            logger.info("Unhandled block type: {}", type(block))
+            return None
+        return render(block)
 
     def _format_tool_input(self, tool_input: dict) -> str:
         """Format tool input as a code block."""
-        return "\n```json\n" + json.dumps(tool_input) + "\n```\n"
-
-    def _create_chunk_envelope(
-        self, request_id: str, stream_id: str, seq: int, sid: str, data: dict
-    ) -> str:
-        """Create a standardized chunk envelope."""
-        envelope = Envelope(
-            request_id=request_id,
-            stream_id=stream_id,
-            seq=seq,
-            direction="s2c",
-            actor="claude",
-            action="stream",
-            modifier="chunk",
-            data=data,
-        )
-        return envelope.model_dump_json()
+        return f"\n```json\n{orjson.dumps(tool_input).decode()}\n```\n"
 
     def _is_result_message(self, chunk: ClaudeSDKMessage) -> bool:
         """Check if the chunk is a result message."""
-        return type(chunk).__name__ == "ResultMessage"
+        return isinstance(chunk, ResultMessage)
 
     async def _send_stream_end(
         self, request_id: str, stream_id: str, sid: str, seq: int
     ) -> None:
         """Send stream end message to the client."""
-        envelope = Envelope(
-            request_id=request_id,
-            stream_id=stream_id,
-            seq=seq,
-            direction="s2c",
-            actor="claude",
-            action="stream",
-            modifier="end",
-            data={"finish_reason": "stop"},
-        )
-        await sio.emit("s2c.claude.stream.end", envelope.model_dump_json(), to=sid)
+        envelope = stream_end_json(request_id, stream_id, "claude", "stop", seq)
+        await sio.emit(END_EVENT, envelope, to=sid)
 
     async def close_claude_stream(
         self, sid: str, request_id: str, stream_id: str
     ) -> None:
         """Close the Claude stream and notify the client."""
         logger.info(f"Closing Claude stream: {stream_id}")
-        envelope = Envelope(
-            request_id=request_id,
-            stream_id=stream_id,
-            direction="s2c",
-            actor="claude",
-            action="stream",
-            modifier="end",
-            data={"finish_reason": "stop"},
-        )
-        await sio.emit("s2c.claude.stream.end", envelope.model_dump_json(), to=sid)
+        envelope = stream_end_json(request_id, stream_id, "claude", "stop")
+        await sio.emit(END_EVENT, envelope, to=sid)
+
+
+# env config is read once here; per-stream state is passed through the calls
+claude_sdk_actor = ClaudeSDKActor()
 
 
 @sio.on("c2s.claude.stream.start")
 async def request_claude_stream(sid: str, envelope: dict) -> str:
-    claude_sdk_actor = ClaudeSDKActor()
     return claude_sdk_actor.handle_stream_start(sid, envelope)
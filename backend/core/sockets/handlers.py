@@ -1,6 +1,6 @@
 from loguru import logger
 
-from . import active_connections, sio
+from . import ConnectionState, active_connections, sio
 
 logger = logger.bind(name=__name__)
 
@@ -8,21 +8,21 @@ logger = logger.bind(name=__name__)
 @sio.event
 async def connect(sid: str, environ: dict) -> None:
     logger.info("connection established")
-    active_connections[sid] = environ
-    logger.info(f"# of active connections: {len(active_connections)}")
+    active_connections[sid] = ConnectionState(sid=sid)
+    logger.info("# of active connections: {}", len(active_connections))
 
 
 @sio.event
 async def hello(sid: str, message: str) -> None:
-    print(f"{sid}, {message}")
+    logger.debug("hello from {}: {}", sid, message)
     await sio.emit(
         "hello",
-        "number of active connections: " + str(len(active_connections)),
+        f"number of active connections: {len(active_connections)}",
         to=sid,
     )
 
 
 @sio.event
 async def disconnect(sid: str) -> None:
-    print(f"connection closed {sid}")
+    logger.info("connection closed {}", sid)
     del active_connections[sid]
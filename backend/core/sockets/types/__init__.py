@@ -1,4 +1,6 @@
 from .envelope import (
+    ACK_INVALID_FORMAT,
+    ACK_MISSING_REQUEST_ID,
     AckFail,
     AckOk,
     Action,
@@ -9,10 +11,19 @@ from .envelope import (
     Error,
     ErrorDetails,
     Modifier,
+    ack_fail_json,
+    ack_ok_json,
+    chunk_frame,
+    chunk_frame_prefix,
+    new_envelope_id,
+    now_ms,
+    stream_end_json,
 )
 from .message import Message
 
 __all__ = [
+    "ACK_INVALID_FORMAT",
+    "ACK_MISSING_REQUEST_ID",
     "AckFail",
     "AckOk",
     "Action",
@@ -24,4 +35,11 @@ __all__ = [
     "ErrorDetails",
     "Message",
     "Modifier",
+    "ack_fail_json",
+    "ack_ok_json",
+    "chunk_frame",
+    "chunk_frame_prefix",
+    "new_envelope_id",
+    "now_ms",
+    "stream_end_json",
 ]
@@ -1,7 +1,8 @@
-import uuid
-from datetime import datetime, timezone
+import secrets
+import time
 from typing import Generic, Literal, TypeVar
 
+import orjson
 from pydantic import BaseModel, ConfigDict, Field
 from pydantic.alias_generators import to_camel
 
@@ -38,15 +39,21 @@ Modifier = Literal["start", "chunk", "end"]
 T = TypeVar("T")
 
 
+def new_envelope_id() -> str:
+    return secrets.token_hex(16)
+
+
+def now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
 class Envelope(AliasedBaseModel, Generic[T]):
     # protocol
     v: str = "1"
 
     # identity & timing
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    ts: int = Field(
-        default_factory=lambda: int(datetime.now(timezone.utc).timestamp() * 1000)
-    )
+    id: str = Field(default_factory=new_envelope_id)
+    ts: int = Field(default_factory=now_ms)
 
     # correlation
     request_id: str | None = None  # requestId in TS
@@ -80,3 +87,81 @@ class Error(AliasedBaseModel):
 class AckFail(AliasedBaseModel):
     ok: bool = False
     error: Error
+
+
+# Acks are tiny and fixed-shape, so they are serialized straight from dicts
+# rather than through AckOk/AckFail. The output matches model_dump_json().
+
+
+def ack_ok_json(request_id: str, stream_id: str) -> str:
+    return orjson.dumps(
+        {"ok": True, "requestId": request_id, "streamId": stream_id}
+    ).decode()
+
+
+def ack_fail_json(code: str, message: str) -> str:
+    return orjson.dumps(
+        {"ok": False, "error": {"code": code, "message": message}}
+    ).decode()
+
+
+ACK_MISSING_REQUEST_ID = ack_fail_json(
+    "invalid_envelope", "The envelope is missing request_id"
+)
+ACK_INVALID_FORMAT = ack_fail_json(
+    "invalid_envelope", "The envelope is not in the correct format"
+)
+
+
+# Within one stream only id, ts, seq and data change between chunks, so the
+# rest of the envelope is serialized once and each frame is spliced onto it.
+
+
+def chunk_frame_prefix(request_id: str, stream_id: str, actor: Actor) -> str:
+    """Serialized fixed fields of a chunk envelope, without the closing brace."""
+    return orjson.dumps(
+        {
+            "v": "1",
+            "requestId": request_id,
+            "streamId": stream_id,
+            "direction": "s2c",
+            "actor": actor,
+            "action": "stream",
+            "modifier": "chunk",
+            "error": None,
+        }
+    ).decode()[:-1]
+
+
+def chunk_frame(prefix: str, seq: int, data: dict) -> str:
+    """Complete a chunk envelope started by chunk_frame_prefix()."""
+    return (
+        f'{prefix},"id":"{new_envelope_id()}","ts":{now_ms()},"seq":{seq},'
+        f'"data":{orjson.dumps(data).decode()}}}'
+    )
+
+
+def stream_end_json(
+    request_id: str,
+    stream_id: str,
+    actor: Actor,
+    finish_reason: str,
+    seq: int | None = None,
+) -> str:
+    """Serialize a stream end envelope; same output as a dumped Envelope."""
+    return orjson.dumps(
+        {
+            "v": "1",
+            "id": new_envelope_id(),
+            "ts": now_ms(),
+            "requestId": request_id,
+            "streamId": stream_id,
+            "seq": seq,
+            "direction": "s2c",
+            "actor": actor,
+            "action": "stream",
+            "modifier": "end",
+            "data": {"finish_reason": finish_reason},
+            "error": None,
+        }
+    ).decode()
@@ -3,6 +3,9 @@ from typing import Literal, cast
 from openai.types.chat import ChatCompletionMessageParam
 from pydantic import BaseModel
 
+# frontend-only roles -> the OpenAI role they are sent as
+_OPENAI_ROLES = {"generative": "assistant", "human": "user"}
+
 
 class Message(BaseModel):
     role: Literal["user", "assistant", "human", "generative", "system"]
@@ -11,16 +14,7 @@ class Message(BaseModel):
     def to_openai_message(
         self,
     ) -> ChatCompletionMessageParam:
-        if self.role == "generative":
-            return cast(
-                ChatCompletionMessageParam,
-                {"role": "assistant", "content": self.content},
-            )
-        elif self.role == "human":
-            return cast(
-                ChatCompletionMessageParam, {"role": "user", "content": self.content}
-            )
-        else:
-            return cast(
-                ChatCompletionMessageParam, {"role": self.role, "content": self.content}
-            )
+        return cast(
+            ChatCompletionMessageParam,
+            {"role": _OPENAI_ROLES.get(self.role, self.role), "content": self.content},
+        )
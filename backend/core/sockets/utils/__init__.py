@@ -1,3 +1,4 @@
-from .streamer import stream_chunks_openai
+from .streamer import emit_queued_deltas, stream_chunks_openai
+from .tasks import spawn_stream_task
 
-__all__ = ["stream_chunks_openai"]
+__all__ = ["emit_queued_deltas", "spawn_stream_task", "stream_chunks_openai"]
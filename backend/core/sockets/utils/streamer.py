@@ -1,8 +1,14 @@
+import asyncio
 from typing import Any, Literal
 
 from loguru import logger
 
-from core.sockets.types.envelope import Actor, Envelope
+from core.sockets.types.envelope import (
+    Actor,
+    chunk_frame,
+    chunk_frame_prefix,
+    stream_end_json,
+)
 from core.sockets.types.message import Message
 
 from .. import async_openai_client, sio
@@ -11,6 +17,8 @@ logger = logger.bind(name=__name__)
 
 MODELS = Literal["gpt-4o", "gpt-5"]
 
+EMIT_QUEUE_SIZE = 256  # deltas buffered per stream before the producer waits
+
 
 async def stream_chunks_openai(
     sid: str,
@@ -32,42 +40,63 @@ async def stream_chunks_openai(
         **kwargs,
     )
 
+    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=EMIT_QUEUE_SIZE)
+    emitter = asyncio.create_task(
+        emit_queued_deltas(
+            queue,
+            sid,
+            f"s2c.{actor}.stream.chunk",
+            chunk_frame_prefix(request_id, stream_id, actor),
+        )
+    )
+    finish_reason = None
+    try:
+        async for chunk in stream:
+            if chunk.choices[0].delta.content is not None:
+                await queue.put(chunk.choices[0].delta.content)
+            elif chunk.choices[0].finish_reason is not None:
+                finish_reason = chunk.choices[0].finish_reason
+    finally:
+        await queue.put(None)
+        seq = await emitter
+
+    if finish_reason is not None:
+        await sio.emit(
+            f"s2c.{actor}.stream.end",
+            stream_end_json(request_id, stream_id, actor, finish_reason, seq),
+            to=sid,
+        )
+
+
+async def emit_queued_deltas(
+    queue: asyncio.Queue[str | None], sid: str, event: str, chunk_prefix: str
+) -> int:
+    """Emit queued deltas as chunk frames until the None sentinel.
+
+    Everything that queued up while the previous emit was in flight is joined
+    and sent as one chunk, so fast token streams cost far fewer frames. Returns
+    the seq of the last chunk sent.
+    """
     seq = 0
-    async for chunk in stream:
-        seq += 1
-        if chunk.choices[0].delta.content is not None:
-            envelope_to_send = Envelope(
-                request_id=request_id,
-                stream_id=stream_id,
-                seq=seq,
-                direction="s2c",
-                actor=actor,
-                action="stream",
-                modifier="chunk",
-                data={
-                    "delta": chunk.choices[0].delta.content,
-                },
-            )
-            await sio.emit(
-                f"s2c.{actor}.stream.chunk",
-                envelope_to_send.model_dump_json(),
-                to=sid,
-            )
-        elif chunk.choices[0].finish_reason is not None:
-            envelope_to_send = Envelope(
-                request_id=request_id,
-                stream_id=stream_id,
-                seq=seq,
-                direction="s2c",
-                actor=actor,
-                action="stream",
-                modifier="end",
-                data={
-                    "finish_reason": chunk.choices[0].finish_reason,
-                },
-            )
-            await sio.emit(
-                f"s2c.{actor}.stream.end",
-                envelope_to_send.model_dump_json(),
-                to=sid,
-            )
+    while True:
+        item = await queue.get()
+        deltas: list[str] = []
+        while item is not None:
+            deltas.append(item)
+            if queue.empty():
+                break
+            item = queue.get_nowait()
+
+        if deltas:
+            seq += 1
+            try:
+                await sio.emit(
+                    event,
+                    chunk_frame(chunk_prefix, seq, {"delta": "".join(deltas)}),
+                    to=sid,
+                )
+            except Exception as e:
+                logger.error(f"Error emitting chunk: {e}")
+
+        if item is None:
+            return seq
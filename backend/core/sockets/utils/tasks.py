@@ -0,0 +1,26 @@
+import asyncio
+from typing import Any, Coroutine
+
+from loguru import logger
+
+logger = logger.bind(name=__name__)
+
+# the loop only keeps weak references to tasks; hold running streams here
+_stream_tasks: set[asyncio.Task] = set()
+
+
+def _on_stream_done(task: asyncio.Task) -> None:
+    _stream_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.opt(exception=exc).error("Stream task {} failed", task.get_name())
+
+
+def spawn_stream_task(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Run a stream coroutine in the background, keeping it alive until done."""
+    task = asyncio.create_task(coro)
+    _stream_tasks.add(task)
+    task.add_done_callback(_on_stream_done)
+    return task
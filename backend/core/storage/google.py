@@ -39,11 +39,14 @@ class StorageBucketClient:
         Args:
             local_file_path: Path to the local file to upload
             blob_name: Name/path for the blob in the bucket
+
+        Raises:
+            FileNotFoundError: If the local file doesn't exist
         """
         local_path = Path(local_file_path)
-        if not local_path.exists():
-            raise FileNotFoundError(f"Local file not found: {local_path}")
 
+        # upload_from_filename opens the file itself and raises
+        # FileNotFoundError if it is missing, so no separate exists() check
         blob = self.bucket.blob(blob_name)
         blob.upload_from_filename(str(local_path))
         logger.info(
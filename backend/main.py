@@ -1,4 +1,6 @@
+import asyncio
 import os
+from contextlib import suppress
 from typing import AsyncGenerator
 
 import socketio  # type: ignore[import-untyped]
@@ -10,6 +12,7 @@ from loguru import logger
 # for env variable laoding
 from core import config  # noqa: F401
 from core.api.routers import router as v1_router
+from core.api.session import sweep_expired_sessions
 from core.logging import setup_logging
 from core.sockets import register_sio_handlers, sio
 
@@ -25,6 +28,7 @@ OPTIONAL_ENV_VARS = {
     "CLAUDE_MODEL": "claude-3-5-sonnet-20241022",
     "TEMP_DIR": None,  # Uses system default
     "OPERATION_TIMEOUT": "3600",  # 1 hour in seconds
+    "CLAUDE_MAX_CONCURRENT": "8",  # concurrent Claude SDK sessions
 }
 
 
@@ -61,8 +65,13 @@ async def lifecycle_manager(self) -> AsyncGenerator[None, None]:
     # register socketio handlers
     register_sio_handlers()
 
+    session_sweeper = asyncio.create_task(sweep_expired_sessions())
+
     yield
     logger.info("Shutting down FastAPI app")
+    session_sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await session_sweeper
 
 
 fastapi_app = FastAPI(lifespan=lifecycle_manager)